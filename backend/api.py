@@ -11,6 +11,11 @@ from tensorflow.keras.models import load_model
 import joblib
 import random 
 
+try:
+    from backend.snapshot import encode_json
+except ImportError: # Ejecutado como script (python backend/api.py)
+    from snapshot import encode_json
+
 # --- CONFIGURACIÓN ---
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 BASE_DIR = os.path.dirname(CURRENT_DIR)
@@ -257,7 +262,84 @@ def predict_recursive(model, base_sequence, scaler, last_known_close, steps=5):
 
     return future_prices
 
-async def update_cycle(model, scaler):
+def serialize_candles(df):
+    """
+    Convierte el DataFrame en memoria al formato que espera el frontend
+    (columnas en minúsculas y datetime como string).
+    """
+    if df is None or df.empty:
+        return []
+
+    # Descartamos velas con NaN/inf (init_data usa errors='coerce'): no son JSON válido.
+    # replace() ya devuelve una copia, así no alteramos el DF original
+    res_df = df.replace([np.inf, -np.inf], np.nan).dropna(subset=FEATURE_COLS)
+
+    # Renombrar columnas para compatibilidad con frontend (que espera minúsculas)
+    res_df = res_df.rename(columns={
+        'Open': 'open',
+        'High': 'high',
+        'Low': 'low',
+        'Close': 'close',
+        'Volume': 'volume'
+    })
+
+    res_df['datetime'] = res_df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    return res_df.to_dict(orient='records')
+
+def finite_or_none(value):
+    """NaN/inf no son JSON válido: se publican como null (el frontend ya los trata como hueco)."""
+    return float(value) if np.isfinite(value) else None
+
+def serialize_past_predictions(past_predictions):
+    """Descarta las predicciones históricas no finitas (ej. ventanas con velas NaN)."""
+    return [p for p in past_predictions if np.isfinite(p["predicted_close"])]
+
+def prediction_status():
+    return {
+        "history": [finite_or_none(v) for v in global_state["history_5m"]],
+        "predictions": [finite_or_none(v) for v in global_state["predictions_5m"]],
+        "last_trained_time": global_state["last_trained_time"],
+        "status": global_state["status"],
+        "is_training": global_state["is_training"]
+    }
+
+def publish_snapshot(snapshot_writer):
+    """
+    Serializa el estado global una sola vez y lo publica para los workers de solo lectura
+    (ver backend/server.py). Sin escritor (modo un solo proceso) no hace nada.
+    """
+    if snapshot_writer is None:
+        return
+    sections = {
+        "data": lambda: serialize_candles(global_state["df"]),
+        "predict": prediction_status,
+        "predictions": lambda: serialize_past_predictions(global_state["past_predictions"]),
+    }
+    payloads = {}
+    stale = []
+    for name, build in sections.items():
+        try:
+            payloads[name] = encode_json(build())
+        except Exception as e:
+            # Una sección inválida no debe congelar las demás: mantenemos su última versión
+            # publicada y la marcamos como desactualizada (la ven /api/health y /api/predict)
+            print(f"   ⚠️ No se pudo serializar '{name}' ({e}). Se mantiene la versión anterior.")
+            payloads[name] = snapshot_writer.payloads[name]
+            stale.append(name)
+    version = snapshot_writer.publish(payloads, stale=stale)
+    print(f"   📤 Snapshot v{version} publicado.")
+
+async def bootstrap(model, scaler):
+    """Carga inicial: datos en memoria + backtesting para llenar past_predictions."""
+    # 1. Cargar datos iniciales en memoria
+    df = await init_data(scaler)
+
+    # 2. Backtesting inicial (llenar past_predictions con los 2000 datos)
+    initial_preds = generate_past_predictions(model, scaler, df, count=2000)
+    global_state["past_predictions"] = initial_preds
+
+async def update_cycle(model, scaler, snapshot_writer=None):
     print(">>> SISTEMA ONLINE: Escuchando mercado (In-Memory)... <<<")
     
     while True:
@@ -266,11 +348,9 @@ async def update_cycle(model, scaler):
             if global_state["df"] is None or global_state["df"].empty:
                 print(" ⚠️ Datos no inicializados. Intentando descargar datos iniciales...")
                 try:
-                    await init_data(scaler)
-                    # Si tuvimos éxito, también generamos las predicciones históricas iniciales
-                    df = global_state["df"]
-                    initial_preds = generate_past_predictions(model, scaler, df, count=2000)
-                    global_state["past_predictions"] = initial_preds
+                    # Si tuvimos éxito, también se generan las predicciones históricas iniciales
+                    await bootstrap(model, scaler)
+                    publish_snapshot(snapshot_writer)
                     print(" ✅ Recuperación exitosa. Sistema funcional.")
                     continue # Reiniciamos el ciclo ya con datos
                 except Exception as e:
@@ -414,6 +494,8 @@ async def update_cycle(model, scaler):
                 global_state["predictions_5m"] = predictions
                 print(f"   🔮 Real: {last_close_real:.2f} -> Pred (adj): {predictions[0]:.2f}")
 
+            publish_snapshot(snapshot_writer)
+
             await asyncio.sleep(20) 
             
         except Exception as e:
@@ -435,12 +517,7 @@ async def lifespan(app: FastAPI):
     
     # Intentamos carga inicial, pero NO matamos el app si falla
     try:
-        # 1. Cargar datos iniciales en memoria
-        df = await init_data(scaler)
-        
-        # 2. Backtesting inicial (llenar past_predictions con los 2000 datos)
-        initial_preds = generate_past_predictions(model, scaler, df, count=2000)
-        global_state["past_predictions"] = initial_preds
+        await bootstrap(model, scaler)
         print("✅ Carga inicial completada correctamente.")
     except Exception as e:
         print(f"⚠️ Alerta: Falló la carga inicial de datos ({e}). El sistema intentará recuperarse en segundo plano.")
@@ -468,43 +545,18 @@ def get_data():
     """
     Devuelve los datos actuales en memoria (hasta 2000 registros).
     """
-    df = global_state.get("df")
-    if df is None or df.empty:
-        return []
-    
-    # Formatear datetime a string para JSON
-    # Hacemos una copia para no alterar el DF original
-    res_df = df.copy()
-    
-    # Renombrar columnas para compatibilidad con frontend (que espera minúsculas)
-    res_df = res_df.rename(columns={
-        'Open': 'open',
-        'High': 'high',
-        'Low': 'low',
-        'Close': 'close',
-        'Volume': 'volume'
-    })
-
-    res_df['datetime'] = res_df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    
-    return res_df.to_dict(orient='records')
+    return serialize_candles(global_state.get("df"))
 
 @app.get("/api/predict")
 def get_next_prediction():
-    return {
-        "history": global_state["history_5m"],
-        "predictions": global_state["predictions_5m"],
-        "last_trained_time": global_state["last_trained_time"],
-        "status": global_state["status"],
-        "is_training": global_state["is_training"]
-    }
+    return prediction_status()
 
 @app.get("/api/predictions")
 def get_past_predictions():
     """
     Devuelve las predicciones históricas (Train Set Eval).
     """
-    return global_state["past_predictions"]
+    return serialize_past_predictions(global_state["past_predictions"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,172 @@
+"""
+Benchmark de backend/server.py: throughput vs. número de workers y memoria por worker.
+
+Publica un snapshot sintético del mismo tamaño que el real (2000 velas, 2000
+predicciones), levanta `python -m backend.server --workers N` para cada N y
+lo bombardea desde varios procesos cliente con conexiones keep-alive.
+No necesita TensorFlow ni acceso a YFinance.
+
+    python -m backend.benchmarks.bench_serving --workers 1 2 4 --duration 10
+
+Memoria: RSS cuenta entera cada página compartida (incluido el snapshot en
+/dev/shm); PSS la reparte entre los procesos que la comparten, así que es la
+cifra que hay que sumar para estimar el coste total.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+import http.client
+import multiprocessing
+from datetime import datetime, timedelta
+
+from backend.snapshot import SnapshotWriter, encode_json
+
+ENDPOINTS = ["/api/data", "/api/predict", "/api/predictions"]
+
+
+def synthetic_payloads(rows=2000):
+    start = datetime(2025, 1, 1)
+    price = 95000.0
+    candles, preds = [], []
+    for i in range(rows):
+        ts = (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S')
+        price += random.gauss(0, 25)
+        candles.append({
+            "datetime": ts, "open": price, "high": price + 10,
+            "low": price - 10, "close": price, "volume": random.random() * 1e6,
+        })
+        preds.append({"datetime": ts, "predicted_close": price + random.gauss(0, 15)})
+    status = {
+        "history": [c["close"] for c in candles[-15:]],
+        "predictions": [price + 5 * k for k in range(5)],
+        "last_trained_time": candles[-1]["datetime"],
+        "status": "Al día.",
+        "is_training": False,
+    }
+    return {
+        "data": encode_json(candles),
+        "predict": encode_json(status),
+        "predictions": encode_json(preds),
+    }
+
+
+def _client(port, path, deadline, counter):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    done = 0
+    while time.time() < deadline:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"{path} -> HTTP {resp.status}")
+        done += 1
+    conn.close()
+    with counter.get_lock():
+        counter.value += done
+
+
+def _wait_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/predict")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("El servidor no arrancó a tiempo")
+
+
+def _children(pid):
+    kids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            kids.append(int(entry))
+    return kids
+
+
+def _memory_kb(pid):
+    """(RSS, PSS) en kB, leídos de /proc/<pid>/smaps_rollup."""
+    rss = pss = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1])
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1])
+    return rss, pss
+
+
+def run(workers, path, clients, duration, port, snapshot_path):
+    env = dict(os.environ, SNAPSHOT_PATH=snapshot_path)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.server", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(port)
+        counter = multiprocessing.Value("l", 0)
+        deadline = time.time() + duration
+        procs = [multiprocessing.Process(target=_client, args=(port, path, deadline, counter))
+                 for _ in range(clients)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        # Launcher pre-fork de backend/server.py: el padre solo supervisa y los hijos atienden
+        worker_pids = _children(server.pid)
+        mem = [_memory_kb(pid) for pid in worker_pids]
+        return counter.value / duration, mem
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=None, help="procesos cliente (por defecto 2x núcleos)")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--endpoints", nargs="+", default=ENDPOINTS)
+    args = parser.parse_args()
+
+    clients = args.clients or 2 * (os.cpu_count() or 1)
+    snapshot_path = os.path.join(tempfile.mkdtemp(dir="/dev/shm" if os.path.isdir("/dev/shm") else None),
+                                 "bench_snapshot.bin")
+    payloads = synthetic_payloads()
+    SnapshotWriter(snapshot_path).publish(payloads)
+
+    print(f"Núcleos: {os.cpu_count()} | clientes: {clients} | duración: {args.duration}s")
+    print("Tamaño de respuestas: " + ", ".join(f"{k}={len(v) / 1024:.0f}kB" for k, v in payloads.items()))
+    print(f"{'endpoint':<18}{'workers':>8}{'req/s':>10}{'speedup':>9}{'RSS/worker':>12}{'PSS/worker':>12}")
+    try:
+        for path in args.endpoints:
+            base = None
+            for workers in args.workers:
+                rps, mem = run(workers, path, clients, args.duration, args.port, snapshot_path)
+                base = base or rps
+                rss = sum(m[0] for m in mem) / len(mem) / 1024
+                pss = sum(m[1] for m in mem) / len(mem) / 1024
+                print(f"{path:<18}{workers:>8}{rps:>10.0f}{rps / base:>8.2f}x{rss:>10.1f}MB{pss:>10.1f}MB")
+    finally:
+        os.unlink(snapshot_path)
+        os.rmdir(os.path.dirname(snapshot_path))
+
+
+if __name__ == "__main__":
+    main()
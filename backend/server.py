@@ -0,0 +1,210 @@
+"""
+API HTTP de solo lectura para correr con varios workers.
+
+Sirve los snapshots que publica backend/writer.py: no importa TensorFlow,
+pandas ni yfinance, así que cada worker es ligero. El número de workers sale
+de --workers o WEB_CONCURRENCY (por defecto 1).
+
+    python -m backend.server --writer --port 8000 --workers 4
+
+Con --writer el launcher arranca también backend/writer.py y lo supervisa junto
+a los workers (ver serve). Se arranca con `python -m backend.server` en lugar de
+`uvicorn --workers` para controlar el socket de escucha (ver bind_socket).
+"""
+import os
+import sys
+import json
+import time
+import socket
+import signal
+import argparse
+import subprocess
+
+import uvicorn
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+from fastapi.middleware.cors import CORSMiddleware
+
+from backend.snapshot import SnapshotReader, EMPTY_PAYLOADS, encode_json
+
+# El escritor publica cada ~20s más lo que tarde la ingesta; pasado este margen
+# (en segundos) asumimos que está caído o colgado.
+SNAPSHOT_MAX_AGE = float(os.environ.get("SNAPSHOT_MAX_AGE", 120))
+
+reader = SnapshotReader()
+
+app = FastAPI()
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+def snapshot_age(snapshot):
+    return max(0.0, time.time() - snapshot.published_at)
+
+def mark_stale(body, message):
+    """Reescribe el status de /api/predict para que el frontend vea que los datos no se actualizan."""
+    status = json.loads(body)
+    status["status"] = message
+    return encode_json(status)
+
+def stale_message(snapshot, age):
+    """Motivo por el que el snapshot no está al día, o None si lo está."""
+    if age > SNAPSHOT_MAX_AGE:
+        return f"Desactualizado: sin snapshot nuevo desde hace {age:.0f}s."
+    if snapshot.stale:
+        return f"Desactualizado: el escritor no pudo regenerar {', '.join(snapshot.stale)}."
+    return None
+
+def snapshot_response(section):
+    """
+    Devuelve el JSON ya serializado por el escritor, sin volver a decodificarlo
+    (salvo el status de /api/predict cuando el snapshot está desactualizado).
+    Las cabeceras X-Snapshot-Version y X-Snapshot-Age (segundos) permiten saber
+    de qué snapshot viene cada respuesta y qué tan viejo es; X-Snapshot-Stale
+    lista las secciones que repiten una versión anterior.
+    """
+    snapshot = reader.current()
+    if snapshot is None:
+        return Response(EMPTY_PAYLOADS[section], media_type="application/json",
+                        headers={"X-Snapshot-Version": "0"})
+    age = snapshot_age(snapshot)
+    body = snapshot.get(section)
+    headers = {"X-Snapshot-Version": str(snapshot.version), "X-Snapshot-Age": f"{age:.0f}"}
+    if snapshot.stale:
+        headers["X-Snapshot-Stale"] = ",".join(snapshot.stale)
+    if section == "predict":
+        message = stale_message(snapshot, age)
+        if message:
+            body = mark_stale(body, message)
+    return Response(body, media_type="application/json", headers=headers)
+
+# Endpoints async: se ejecutan en el event loop (sin threadpool), así el
+# snapshot mapeado solo se usa desde un hilo por worker.
+@app.get("/api/data")
+async def get_data():
+    """
+    Devuelve los datos actuales del último snapshot (hasta 2000 registros).
+    """
+    return snapshot_response("data")
+
+@app.get("/api/predict")
+async def get_next_prediction():
+    return snapshot_response("predict")
+
+@app.get("/api/predictions")
+async def get_past_predictions():
+    """
+    Devuelve las predicciones históricas (Train Set Eval).
+    """
+    return snapshot_response("predictions")
+
+@app.get("/api/health")
+async def get_health():
+    """
+    503 si no hay snapshot, si el último tiene más de SNAPSHOT_MAX_AGE segundos
+    (escritor caído o colgado) o si alguna sección repite una versión anterior
+    porque el escritor no pudo regenerarla. Pensado para el healthcheck del orquestador.
+    """
+    snapshot = reader.current()
+    if snapshot is None:
+        return JSONResponse({"status": "Sin snapshot.", "version": 0}, status_code=503)
+    age = snapshot_age(snapshot)
+    message = stale_message(snapshot, age)
+    return JSONResponse({
+        "status": message or "Al día.",
+        "version": snapshot.version,
+        "age": round(age, 1),
+        "max_age": SNAPSHOT_MAX_AGE,
+        "stale_sections": list(snapshot.stale),
+    }, status_code=503 if message else 200)
+
+def bind_socket(host, port):
+    """
+    Socket de escucha compartido por todos los workers.
+    `uvicorn --workers N` lo crea con proto=0 y asyncio solo activa TCP_NODELAY
+    cuando proto == IPPROTO_TCP: con Nagle activo cada respuesta pequeña
+    (/api/predict) espera ~40ms al ACK diferido. Lo activamos en el socket de
+    escucha; en Linux las conexiones aceptadas lo heredan.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+def serve(host="0.0.0.0", port=8000, workers=1, writer=False, **uvicorn_kwargs):
+    """
+    Pre-fork mínimo: el padre abre el socket, opcionalmente lanza el escritor y
+    cada worker corre su propio uvicorn.Server sobre el socket. El padre solo
+    supervisa: reenvía SIGTERM/SIGINT a todos los hijos como SIGTERM, espera a
+    que terminen y devuelve 1 si alguno murió por su cuenta, para que el
+    orquestador (Docker, systemd...) reinicie el servicio completo.
+    """
+    sock = bind_socket(host, port)
+    config = uvicorn.Config(app, host=host, port=port, **uvicorn_kwargs)
+
+    children = {}
+    stopping = False
+
+    def stop(signum=None, frame=None):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    if writer:
+        # Sesión propia: el Ctrl+C de la terminal no le llega directamente y solo
+        # recibe un SIGTERM del launcher, que espera a que termine de guardar el modelo.
+        writer_proc = subprocess.Popen([sys.executable, "-m", "backend.writer"], start_new_session=True)
+        children[writer_proc.pid] = "escritor"
+
+    for i in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            uvicorn.Server(config).run(sockets=[sock])
+            os._exit(0)
+        children[pid] = f"worker {i + 1}"
+    print(f"Sirviendo snapshots en http://{host}:{port}: {children}")
+
+    exit_code = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        name = children.pop(pid, None)
+        if name is None:
+            # Huérfano reasignado a nosotros (PID 1 en un contenedor): solo se recoge
+            continue
+        if not stopping:
+            print(f"❌ {name} (pid {pid}) terminó inesperadamente "
+                  f"(código {os.waitstatus_to_exitcode(status)}). Deteniendo el servicio...")
+            exit_code = 1
+            stop()
+    return exit_code
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API de solo lectura sobre los snapshots del escritor.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    # Por defecto 1, como uvicorn: os.cpu_count() ve los núcleos del host, no la cuota del contenedor
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 1)))
+    parser.add_argument("--writer", action="store_true", help="lanzar y supervisar también backend/writer.py")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    sys.exit(serve(args.host, args.port, args.workers, args.writer, log_level=args.log_level))
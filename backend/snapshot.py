@@ -0,0 +1,170 @@
+"""
+Snapshots versionados del estado del backend en un archivo mapeado en memoria.
+
+Un único proceso escritor (ingesta + entrenamiento + inferencia) publica el estado
+ya serializado a JSON; cualquier número de workers HTTP lo lee con `mmap` sin
+importar TensorFlow ni pandas. Este módulo solo usa la librería estándar.
+
+Formato del archivo:
+    cabecera  -> MAGIC | version (u64) | published_at (f64) | len_data | len_predict | len_predictions
+                 | stale (u8, bit i = SECTIONS[i] no se pudo actualizar y repite la versión anterior)
+    secciones -> JSON de /api/data | JSON de /api/predict | JSON de /api/predictions
+
+El escritor genera un archivo temporal y lo sustituye con `os.replace`, que es
+atómico: un lector ve siempre un snapshot completo (el viejo o el nuevo, nunca
+uno a medias) y el mapa viejo sigue siendo válido hasta que el lector lo suelta.
+"""
+import os
+import json
+import mmap
+import struct
+import tempfile
+import time
+
+MAGIC = b"YFS2"
+HEADER = struct.Struct("<4sQdIIIB")
+SECTIONS = ("data", "predict", "predictions")
+
+# /dev/shm es tmpfs en Linux: el "archivo" vive en RAM y las páginas se
+# comparten entre todos los workers que lo mapean.
+_DEFAULT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", os.path.join(_DEFAULT_DIR, "yfinance_snapshot.bin"))
+
+# Respuestas por defecto mientras el escritor no haya publicado nada
+EMPTY_PAYLOADS = {
+    "data": b"[]",
+    "predict": json.dumps({
+        "history": [],
+        "predictions": [],
+        "last_trained_time": None,
+        "status": "Iniciando...",
+        "is_training": False,
+    }).encode(),
+    "predictions": b"[]",
+}
+
+
+def encode_json(obj):
+    """JSON compacto en bytes, listo para enviarse tal cual como cuerpo HTTP."""
+    return json.dumps(obj, separators=(",", ":"), allow_nan=False).encode()
+
+
+def _read_version(path):
+    try:
+        with open(path, "rb") as f:
+            magic, version, *_ = HEADER.unpack(f.read(HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+
+class SnapshotWriter:
+    """
+    Publica snapshots completos. Debe existir un solo escritor por ruta.
+    La versión continúa desde el snapshot existente para que sea monótona
+    incluso si el proceso escritor se reinicia.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self.version = _read_version(path)
+        # Última versión publicada de cada sección (respaldo si una falla al serializar).
+        # Tras un reinicio partimos del snapshot existente, no de EMPTY_PAYLOADS, para
+        # no sustituir datos buenos por JSON vacío si la primera serialización falla.
+        previous = SnapshotReader(path).current()
+        if previous is not None:
+            self.payloads = {name: previous.get(name) for name in SECTIONS}
+        else:
+            self.payloads = dict(EMPTY_PAYLOADS)
+
+    def publish(self, payloads, stale=()):
+        """
+        `payloads` es un dict {sección: bytes JSON}; `stale` las secciones que repiten
+        su versión anterior porque no se pudieron regenerar. Devuelve la versión publicada.
+        """
+        bodies = [payloads[name] for name in SECTIONS]
+        stale_mask = sum(1 << i for i, name in enumerate(SECTIONS) if name in stale)
+        self.version += 1
+        header = HEADER.pack(MAGIC, self.version, time.time(), *(len(b) for b in bodies), stale_mask)
+
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                for body in bodies:
+                    f.write(body)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.payloads = dict(zip(SECTIONS, bodies))
+        return self.version
+
+
+class Snapshot:
+    """Vista de solo lectura sobre un snapshot mapeado."""
+
+    def __init__(self, buf, version, published_at, offsets, stale):
+        self._buf = buf
+        self.version = version
+        self.published_at = published_at
+        self._offsets = offsets
+        # Secciones que el escritor no pudo regenerar en este snapshot
+        self.stale = stale
+
+    def get(self, name):
+        start, end = self._offsets[name]
+        return self._buf[start:end]
+
+
+class SnapshotReader:
+    """
+    Lector perezoso: solo vuelve a mapear el archivo cuando cambia su inodo
+    (es decir, cuando el escritor hizo `os.replace`). Cada petición cuesta un
+    `stat` más una copia del segmento pedido.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self._key = None
+        self._snapshot = None
+
+    def current(self):
+        """Devuelve el último `Snapshot` publicado, o None si aún no hay ninguno."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return self._snapshot
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key != self._key:
+            snapshot = self._load()
+            if snapshot is not None:
+                self._snapshot = snapshot
+                self._key = key
+        return self._snapshot
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Archivo reemplazado entre el stat y el open, o vacío: reintentamos en la próxima petición
+            return None
+
+        if len(buf) < HEADER.size:
+            buf.close()
+            return None
+        magic, version, published_at, *lengths, stale_mask = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or HEADER.size + sum(lengths) > len(buf):
+            buf.close()
+            return None
+
+        offsets = {}
+        pos = HEADER.size
+        for name, length in zip(SECTIONS, lengths):
+            offsets[name] = (pos, pos + length)
+            pos += length
+        stale = tuple(name for i, name in enumerate(SECTIONS) if stale_mask & (1 << i))
+        return Snapshot(buf, version, published_at, offsets, stale)
@@ -0,0 +1,48 @@
+"""
+Proceso escritor único: ingesta (YFinance), entrenamiento online e inferencia.
+
+No expone HTTP; publica snapshots versionados que sirven los workers de
+backend/server.py. Debe correr exactamente UNA instancia por SNAPSHOT_PATH.
+
+    python -m backend.writer
+
+Con SIGTERM se cancela el ciclo en su siguiente `await`, nunca a mitad de
+`model.save`, así el modelo en disco no queda truncado.
+"""
+import signal
+import asyncio
+
+from backend.api import load_resources, bootstrap, update_cycle, publish_snapshot
+from backend.snapshot import SnapshotWriter, EMPTY_PAYLOADS
+
+
+async def main():
+    print("--- INICIANDO ESCRITOR (Modo Snapshot) ---")
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    snapshot_writer = SnapshotWriter()
+
+    # Si no hay snapshot previo publicamos uno vacío para que los lectores respondan "Iniciando...".
+    # Si el escritor se reinicia, los lectores siguen sirviendo el último snapshot mientras tanto.
+    if snapshot_writer.version == 0:
+        snapshot_writer.publish(EMPTY_PAYLOADS)
+    print(f"Publicando snapshots en {snapshot_writer.path} (versión actual: {snapshot_writer.version})")
+
+    # Sin modelo/scaler no hay nada que publicar: aquí sí dejamos que explote
+    model, scaler = load_resources()
+
+    # Intentamos carga inicial, pero NO matamos el proceso si falla
+    try:
+        await bootstrap(model, scaler)
+        publish_snapshot(snapshot_writer)
+        print("✅ Carga inicial completada correctamente.")
+    except Exception as e:
+        print(f"⚠️ Alerta: Falló la carga inicial de datos ({e}). El sistema intentará recuperarse en segundo plano.")
+
+    await update_cycle(model, scaler, snapshot_writer)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        print("--- APAGANDO ESCRITOR ---")